@@ -7,6 +7,7 @@ generated project, and exits with non-zero if linting fails.
 
 from __future__ import annotations
 
+import itertools
 import os
 import shutil
 import subprocess
@@ -16,11 +17,16 @@ from pathlib import Path
 
 from copier import run_copy
 
+from scripts.tmpfs import tmpfs_root
+
 RED = "\033[0;31m"
 GREEN = "\033[0;32m"
 YELLOW = "\033[0;33m"
 RESET = "\033[0m"
 
+# Above this many files a single directory walk beats one ruff process per file
+STDIN_MAX_FILES = 8
+
 
 def _get_ruff_path() -> str:
     """Get the full path to ruff executable."""
@@ -31,68 +37,114 @@ def _get_ruff_path() -> str:
     return ruff_path
 
 
-def main() -> int:
-    """Generate template and run ruff check."""
-    root_dir = Path(__file__).parent.parent
-    ruff = _get_ruff_path()
-
-    with tempfile.TemporaryDirectory() as tmpdir:
-        output_dir = Path(tmpdir)
-
-        print(f"{YELLOW}Generating template with default options...{RESET}")
-
-        # Skip post-generation hooks (dependency installation) during linting
-        os.environ["COPIER_TEST_MODE"] = "1"
-
-        try:
-            run_copy(
-                str(root_dir),
-                str(output_dir),
-                unsafe=True,
-                defaults=True,
-                vcs_ref="HEAD",
-            )
-        except (OSError, ValueError) as e:
-            print(f"{RED}Error generating template: {e}{RESET}")
-            return 1
-
-        generated_dirs = list(output_dir.iterdir())
-        if not generated_dirs:
-            print(f"{RED}No project was generated{RESET}")
-            return 1
-
-        project_dir = output_dir
-        print(f"{GREEN}Generated project in: {project_dir}{RESET}")
-
-        # Fix import ordering first - the correct order depends on the project_slug
-        # value which isn't known until generation (e.g., 'my_project' vs 'zoo_project')
-        print(f"{YELLOW}Fixing import ordering...{RESET}")
-        subprocess.run(  # noqa: S603
-            [ruff, "check", "--select", "I", "--fix", "."],
+def _ruff_env() -> dict[str, str]:
+    """Environment for ruff subprocesses, pinning its thread pool to every core."""
+    return {**os.environ, "RAYON_NUM_THREADS": str(os.cpu_count() or 4)}
+
+
+def _ruff_check(
+    ruff: str,
+    project_dir: Path,
+    *,
+    capture: bool = False,
+) -> subprocess.CompletedProcess:
+    """Run ruff check on the project, piping small file sets through stdin.
+
+    Import ordering (I) is ignored: the correct order depends on the project_slug
+    value which isn't known until generation (e.g., 'my_project' vs 'zoo_project'),
+    and those violations are always auto-fixable, so fixing them first would only cost
+    another ruff process. Output is discarded unless ``capture`` is set, so the common
+    passing case doesn't buffer and decode ruff's report.
+    """
+    output = {"capture_output": True} if capture else {"stdout": subprocess.DEVNULL, "stderr": subprocess.PIPE}
+    # Stop walking as soon as the project is too big for the stdin branch
+    python_files = list(itertools.islice(project_dir.rglob("*.py"), STDIN_MAX_FILES + 1))
+    if not python_files or len(python_files) > STDIN_MAX_FILES:
+        return subprocess.run(  # noqa: S603
+            [ruff, "check", "--no-respect-gitignore", "--ignore", "I", "."],
             cwd=project_dir,
-            capture_output=True,
+            env=_ruff_env(),
+            text=True,
             check=False,
+            **output,
         )
 
-        print(f"{YELLOW}Running ruff check...{RESET}")
-
+    for path in sorted(python_files):
         result = subprocess.run(  # noqa: S603
-            [ruff, "check", "."],
+            [
+                ruff,
+                "check",
+                "--no-fix",
+                "--force-exclude",
+                "--ignore",
+                "I",
+                "--stdin-filename",
+                str(path.relative_to(project_dir)),
+                "-",
+            ],
             cwd=project_dir,
-            capture_output=True,
+            env=_ruff_env(),
+            input=path.read_text(),
             text=True,
             check=False,
+            **output,
         )
-
         if result.returncode != 0:
-            print(f"{RED}Ruff check failed:{RESET}")
-            print(result.stdout)
-            if result.stderr:
-                print(result.stderr)
-            return 1
-
-        print(f"{GREEN}Ruff check passed!{RESET}")
-        return 0
+            break
+    return result
+
+
+def _generate_and_lint(root_dir: Path, output_dir: Path, ruff: str) -> int:
+    """Generate the template into output_dir and run ruff check on it."""
+    print(f"{YELLOW}Generating template with default options...{RESET}")
+
+    # Skip post-generation hooks (dependency installation) during linting
+    os.environ["COPIER_TEST_MODE"] = "1"
+
+    try:
+        run_copy(
+            str(root_dir),
+            str(output_dir),
+            unsafe=True,
+            defaults=True,
+            vcs_ref="HEAD",
+        )
+    except (OSError, ValueError) as e:
+        print(f"{RED}Error generating template: {e}{RESET}")
+        return 1
+
+    generated_dirs = list(output_dir.iterdir())
+    if not generated_dirs:
+        print(f"{RED}No project was generated{RESET}")
+        return 1
+
+    project_dir = output_dir
+    print(f"{GREEN}Generated project in: {project_dir}{RESET}")
+
+    print(f"{YELLOW}Running ruff check...{RESET}")
+
+    result = _ruff_check(ruff, project_dir)
+
+    if result.returncode != 0:
+        # Only pay for capturing the report when there is something to show
+        result = _ruff_check(ruff, project_dir, capture=True)
+        print(f"{RED}Ruff check failed:{RESET}")
+        print(result.stdout)
+        if result.stderr:
+            print(result.stderr)
+        return 1
+
+    print(f"{GREEN}Ruff check passed!{RESET}")
+    return 0
+
+
+def main() -> int:
+    """Generate template and run ruff check."""
+    root_dir = Path(__file__).parent.parent
+    ruff = _get_ruff_path()
+
+    with tempfile.TemporaryDirectory(dir=tmpfs_root()) as tmpdir:
+        return _generate_and_lint(root_dir, Path(tmpdir), ruff)
 
 
 if __name__ == "__main__":
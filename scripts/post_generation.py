@@ -7,16 +7,27 @@ This script is called as a Copier task after template generation.
 It reads context from the .copier-answers.yml file in the destination directory.
 """
 
+import concurrent.futures
+import functools
 import os
 import random
+import re
 import shutil
 import string
 import subprocess
 import sys
+import tempfile
+import threading
 from pathlib import Path
 
 import yaml
 
+# Prefer the LibYAML-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 try:
     random = random.SystemRandom()
     using_sysrandom = True
@@ -31,6 +42,15 @@ SUCCESS = "\x1b[1;32m [SUCCESS]: "
 
 DEBUG_VALUE = "debug"
 
+# Dependency installers run concurrently; keep their status lines from interleaving
+print_lock = threading.Lock()
+
+
+def locked_print(message: str):
+    """Print a status line while holding print_lock."""
+    with print_lock:
+        print(message)
+
 
 def load_copier_answers() -> dict:
     """Load answers from .copier-answers.yml"""
@@ -39,8 +59,24 @@ def load_copier_answers() -> dict:
         print(WARNING + "No .copier-answers.yml found, using defaults" + TERMINATOR)
         return {}
 
-    with answers_file.open() as f:
-        return yaml.safe_load(f) or {}
+    return yaml.load(answers_file.read_bytes(), Loader=SafeLoader) or {}
+
+
+@functools.cache
+def _get_symbols(*, using_digits: bool, using_ascii_letters: bool, using_punctuation: bool) -> str:
+    """Build (once per combination of options) the alphabet used for random strings."""
+    symbols = ""
+    if using_digits:
+        symbols += string.digits
+    if using_ascii_letters:
+        symbols += string.ascii_letters
+    if using_punctuation:
+        all_punctuation = set(string.punctuation)
+        # These symbols can cause issues in environment variables
+        unsuitable = {"'", '"', "\\", "$"}
+        suitable = all_punctuation.difference(unsuitable)
+        symbols += "".join(sorted(suitable))
+    return symbols
 
 
 def generate_random_string(
@@ -59,45 +95,39 @@ def generate_random_string(
     if not using_sysrandom:
         return None
 
-    symbols = []
-    if using_digits:
-        symbols += list(string.digits)
-    if using_ascii_letters:
-        symbols += list(string.ascii_letters)
-    if using_punctuation:
-        all_punctuation = set(string.punctuation)
-        # These symbols can cause issues in environment variables
-        unsuitable = {"'", '"', "\\", "$"}
-        suitable = all_punctuation.difference(unsuitable)
-        symbols += list(suitable)
-    return "".join([random.choice(symbols) for _ in range(length)])
+    symbols = _get_symbols(
+        using_digits=using_digits,
+        using_ascii_letters=using_ascii_letters,
+        using_punctuation=using_punctuation,
+    )
+    return "".join(random.choices(symbols, k=length))
 
 
 def generate_random_user() -> str | None:
     return generate_random_string(length=32, using_ascii_letters=True)
 
 
-def set_flag(file_path: Path, flag: str, value: str | None = None, formatted: str | None = None, **kwargs) -> str:
-    """Replace a flag placeholder in a file with a value or random string."""
-    if value is None:
-        random_string = generate_random_string(**kwargs)
-        if random_string is None:
+def replace_flags(text: str, mapping: dict[str, str | None]) -> str:
+    """Replace all flag placeholders in text in a single pass."""
+    replacements = {}
+    for flag, value in mapping.items():
+        if value is None:
             print(
                 "We couldn't find a secure pseudo-random number generator on your "
                 f"system. Please, make sure to manually {flag} later.",
             )
-            random_string = flag
-        if formatted is not None:
-            random_string = formatted.format(random_string)
-        value = random_string
+            continue
+        replacements[flag] = value
+    if not replacements:
+        return text
+
+    pattern = re.compile("|".join(map(re.escape, replacements)))
+    return pattern.sub(lambda match: replacements[match.group(0)], text)
 
-    with file_path.open("r+") as f:
-        file_contents = f.read().replace(flag, value)
-        f.seek(0)
-        f.write(file_contents)
-        f.truncate()
 
-    return value
+def set_flags_batch(file_path: Path, mapping: dict[str, str | None]) -> None:
+    """Replace several flag placeholders in a file with a single read and write."""
+    file_path.write_text(replace_flags(file_path.read_text(), mapping))
 
 
 def generate_env_file(debug: bool = False, use_celery: bool = False):
@@ -109,9 +139,6 @@ def generate_env_file(debug: bool = False, use_celery: bool = False):
         print(WARNING + ".env.example not found, skipping .env generation" + TERMINATOR)
         return
 
-    # Copy .env.example to .env
-    shutil.copy(env_example, env_file)
-
     # Generate values
     postgres_user = DEBUG_VALUE if debug else generate_random_user()
     postgres_password = (
@@ -120,11 +147,12 @@ def generate_env_file(debug: bool = False, use_celery: bool = False):
     django_secret_key = generate_random_string(length=64, using_digits=True, using_ascii_letters=True)
     django_admin_url = generate_random_string(length=32, using_digits=True, using_ascii_letters=True)
 
-    # Set values in .env file
-    set_flag(env_file, "!!!SET POSTGRES_USER!!!", value=postgres_user)
-    set_flag(env_file, "!!!SET POSTGRES_PASSWORD!!!", value=postgres_password)
-    set_flag(env_file, "!!!SET DJANGO_SECRET_KEY!!!", value=django_secret_key)
-    set_flag(env_file, "!!!SET DJANGO_ADMIN_URL!!!", value=f"{django_admin_url}/")
+    flags = {
+        "!!!SET POSTGRES_USER!!!": postgres_user,
+        "!!!SET POSTGRES_PASSWORD!!!": postgres_password,
+        "!!!SET DJANGO_SECRET_KEY!!!": django_secret_key,
+        "!!!SET DJANGO_ADMIN_URL!!!": f"{django_admin_url}/",
+    }
 
     # Set Celery Flower credentials if Celery is enabled
     if use_celery:
@@ -132,8 +160,11 @@ def generate_env_file(debug: bool = False, use_celery: bool = False):
         flower_password = (
             DEBUG_VALUE if debug else generate_random_string(length=64, using_digits=True, using_ascii_letters=True)
         )
-        set_flag(env_file, "!!!SET CELERY_FLOWER_USER!!!", value=flower_user)
-        set_flag(env_file, "!!!SET CELERY_FLOWER_PASSWORD!!!", value=flower_password)
+        flags["!!!SET CELERY_FLOWER_USER!!!"] = flower_user
+        flags["!!!SET CELERY_FLOWER_PASSWORD!!!"] = flower_password
+
+    # Render .env from .env.example with a single read and write
+    env_file.write_text(replace_flags(env_example.read_text(), flags))
 
 
 def set_flags_in_settings_files():
@@ -141,12 +172,15 @@ def set_flags_in_settings_files():
     for settings_file in ["local.py", "test.py"]:
         file_path = Path("config", "settings", settings_file)
         if file_path.exists():
-            set_flag(
+            set_flags_batch(
                 file_path,
-                "!!!SET DJANGO_SECRET_KEY!!!",
-                length=64,
-                using_digits=True,
-                using_ascii_letters=True,
+                {
+                    "!!!SET DJANGO_SECRET_KEY!!!": generate_random_string(
+                        length=64,
+                        using_digits=True,
+                        using_ascii_letters=True,
+                    ),
+                },
             )
 
 
@@ -159,57 +193,70 @@ def append_to_gitignore_file(ignored_line: str):
             f.write("\n")
 
 
+def _docker_build(*args: str) -> None:
+    """Run a quiet BuildKit ``docker`` build, raising CalledProcessError on failure."""
+    subprocess.run(
+        ["docker", *args],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        env={
+            **os.environ,
+            "DOCKER_BUILDKIT": "1",
+        },
+    )
+
+
 def setup_python_dependencies():
     """Install Python dependencies using uv via Docker."""
-    print(INFO + "Installing Python dependencies using uv..." + TERMINATOR)
+    locked_print(INFO + "Installing Python dependencies using uv..." + TERMINATOR)
 
     uv_docker_image_path = Path("docker/local/uv/Dockerfile")
     if not uv_docker_image_path.exists():
-        print(WARNING + "uv Dockerfile not found, skipping Python dependency installation" + TERMINATOR)
+        locked_print(WARNING + "uv Dockerfile not found, skipping Python dependency installation" + TERMINATOR)
         return
 
     uv_image_tag = "copier-turbo-django-uv-runner:latest"
+    build_args = ["--load", "-t", uv_image_tag, "-f", str(uv_docker_image_path), "-q", "."]
     try:
-        subprocess.run(
-            [
-                "docker",
-                "build",
-                "--load",
-                "-t",
-                uv_image_tag,
-                "-f",
-                str(uv_docker_image_path),
-                "-q",
-                ".",
-            ],
-            check=True,
-            env={
-                **os.environ,
-                "DOCKER_BUILDKIT": "1",
-            },
-        )
+        # Opt-in (e.g. on CI): reuse the uv image layers across generations via a local BuildKit cache
+        if os.getenv("COPIER_USE_BUILDX_CACHE"):
+            cache_dir = Path(tempfile.gettempdir()) / "copier-uv-cache"
+            try:
+                _docker_build(
+                    "buildx",
+                    "build",
+                    f"--cache-from=type=local,src={cache_dir}",
+                    f"--cache-to=type=local,dest={cache_dir},mode=max",
+                    *build_args,
+                )
+            except subprocess.CalledProcessError as e:
+                # The local cache exporter needs a docker-container builder (docker buildx create --use)
+                locked_print(WARNING + f"Cached buildx build failed, retrying without cache:\n{e.stderr}" + TERMINATOR)
+                _docker_build("build", *build_args)
+        else:
+            _docker_build("build", *build_args)
     except subprocess.CalledProcessError as e:
-        print(WARNING + f"Error building Docker image: {e}" + TERMINATOR)
+        locked_print(WARNING + f"Error building Docker image: {e}\n{e.stderr}" + TERMINATOR)
         return
     except FileNotFoundError:
-        print(WARNING + "Docker not found, skipping Python dependency installation" + TERMINATOR)
+        locked_print(WARNING + "Docker not found, skipping Python dependency installation" + TERMINATOR)
         return
 
     current_path = Path.cwd().absolute()
-    uv_cmd = ["docker", "run", "--rm", "-v", f"{current_path}:/app", uv_image_tag, "uv"]
-
-    # Install production dependencies
-    try:
-        subprocess.run([*uv_cmd, "add", "--no-sync", "-r", "requirements/production.txt"], check=True)
-    except subprocess.CalledProcessError as e:
-        print(WARNING + f"Error installing production dependencies: {e}" + TERMINATOR)
-        return
-
-    # Install local (development) dependencies
+    # Install production and local (development) dependencies in a single container run
+    uv_add = "uv add --no-sync -r requirements/production.txt && uv add --no-sync --dev -r requirements/local.txt"
     try:
-        subprocess.run([*uv_cmd, "add", "--no-sync", "--dev", "-r", "requirements/local.txt"], check=True)
+        subprocess.run(
+            ["docker", "run", "--rm", "-v", f"{current_path}:/app", uv_image_tag, "sh", "-c", uv_add],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
     except subprocess.CalledProcessError as e:
-        print(WARNING + f"Error installing local dependencies: {e}" + TERMINATOR)
+        locked_print(WARNING + f"Error installing Python dependencies: {e}\n{e.stderr}" + TERMINATOR)
         return
 
     # Remove the requirements directory
@@ -222,25 +269,27 @@ def setup_python_dependencies():
     if uv_image_parent_dir_path.exists():
         shutil.rmtree(str(uv_image_parent_dir_path))
 
-    print(SUCCESS + "Python dependencies installed!" + TERMINATOR)
+    locked_print(SUCCESS + "Python dependencies installed!" + TERMINATOR)
 
 
 def install_pnpm_dependencies():
     """Install frontend dependencies using pnpm."""
-    print(INFO + "Installing frontend dependencies using pnpm..." + TERMINATOR)
+    locked_print(INFO + "Installing frontend dependencies using pnpm..." + TERMINATOR)
 
     try:
         subprocess.run(["pnpm", "--version"], check=True, capture_output=True)
     except (subprocess.CalledProcessError, FileNotFoundError):
-        print(WARNING + "pnpm is not installed. Please install pnpm to set up frontend dependencies." + TERMINATOR)
-        print(HINT + "Install with: npm install -g pnpm" + TERMINATOR)
+        locked_print(
+            WARNING + "pnpm is not installed. Please install pnpm to set up frontend dependencies." + TERMINATOR,
+        )
+        locked_print(HINT + "Install with: npm install -g pnpm" + TERMINATOR)
         return
 
     try:
         subprocess.run(["pnpm", "install"], check=True)
-        print(SUCCESS + "Frontend dependencies installed!" + TERMINATOR)
+        locked_print(SUCCESS + "Frontend dependencies installed!" + TERMINATOR)
     except subprocess.CalledProcessError as e:
-        print(WARNING + f"Error installing frontend dependencies: {e}" + TERMINATOR)
+        locked_print(WARNING + f"Error installing frontend dependencies: {e}" + TERMINATOR)
 
 
 def fix_python_formatting():
@@ -298,8 +347,11 @@ def main():
 
     # Install dependencies and run formatters (skip if COPIER_TEST_MODE is set)
     if not os.getenv("COPIER_TEST_MODE"):
-        setup_python_dependencies()
-        install_pnpm_dependencies()
+        # Docker/uv and pnpm installs are independent, so run them side by side
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(setup_python_dependencies), executor.submit(install_pnpm_dependencies)]
+            for future in futures:
+                future.result()
         fix_python_formatting()
         fix_frontend_formatting()
 
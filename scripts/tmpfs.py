@@ -0,0 +1,23 @@
+"""RAM-backed temporary directory shared by the lint hook and the test suite."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# RAM-backed filesystem used for throwaway projects on Linux, opt-in with COPIER_USE_TMPFS=1.
+# Docker's default /dev/shm is only 64 MB, while a full test run takes ~50 MB and pytest
+# keeps the last 3, so it is only used when there is room to spare
+SHM_DIR = Path("/dev/shm")  # noqa: S108
+SHM_MIN_FREE = 256 * 1024 * 1024
+
+
+def tmpfs_root() -> str | None:
+    """Return a RAM-backed directory for throwaway projects, if enabled and roomy enough."""
+    if not os.getenv("COPIER_USE_TMPFS") or sys.platform != "linux" or not SHM_DIR.is_dir():
+        return None
+    if shutil.disk_usage(SHM_DIR).free < SHM_MIN_FREE:
+        return None
+    return str(SHM_DIR)
@@ -1,14 +1,12 @@
-from collections import defaultdict
-
-
 class EventBus:
     """
     A simple in-memory pub-sub mechanism for domain events.
     """
 
     def __init__(self):
-        # Dictionary where key=EventClass, value=list of handler callables
-        self._subscribers = defaultdict(list)
+        # Dictionary where key=EventClass, value=tuple of handler callables.
+        # Tuples are rebuilt on subscribe, so publish can iterate them safely.
+        self._subscribers = {}
 
     def subscribe(self, event_type, handler):
         """
@@ -16,14 +14,16 @@ class EventBus:
         event_type: a class of DomainEvent
         handler: a callable with signature handler(event)
         """
-        self._subscribers[event_type].append(handler)
+        handlers = self._subscribers.get(event_type, ())
+        self._subscribers[event_type] = (*handlers, handler)
 
     def publish(self, event):
         """
         Publish an event to all subscribers.
         """
-        event_type = type(event)
-        handlers = self._subscribers.get(event_type, [])
+        handlers = self._subscribers.get(type(event))
+        if handlers is None:
+            return
         for handler in handlers:
             handler(event)
 
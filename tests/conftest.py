@@ -3,22 +3,30 @@ from pathlib import Path
 
 import pytest
 
+from scripts.tmpfs import tmpfs_root
+
 # Skip dependency installation during tests for faster execution.
 # The linting tests (ruff, djlint, django-upgrade) don't need
 # dependencies installed - they just check the generated code syntax.
 # Use test_docker.sh for full integration testing with dependencies.
 os.environ["COPIER_TEST_MODE"] = "1"
 
+# Optionally generate projects on tmpfs: every test writes a full project
+# to disk only to lint it and throw it away. PYTEST_DEBUG_TEMPROOT rather than
+# --basetemp keeps pytest's numbered per-run dirs, so concurrent runs don't wipe each other.
+if shm_dir := tmpfs_root():
+    os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", shm_dir)
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def template_path():
     """Return the path to the template root directory."""
     return Path(__file__).parent.parent
 
 
-@pytest.fixture
-def context():
-    """Default context for template generation."""
+@pytest.fixture(scope="session")
+def default_context():
+    """Default context for template generation, shared across the session."""
     return {
         "project_name": "My Test Project",
         "project_slug": "my_test_project",
@@ -29,3 +37,9 @@ def context():
         "version": "0.1.0",
         "timezone": "UTC",
     }
+
+
+@pytest.fixture
+def context(default_context):
+    """Per-test copy of the default context, safe to mutate."""
+    return dict(default_context)
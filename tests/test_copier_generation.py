@@ -1,11 +1,14 @@
-import glob
+from __future__ import annotations
+
 import os
 import re
+import shutil
 import sys
-from collections.abc import Iterable
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pytest
+from allpairspy import AllPairs
 
 try:
     import sh
@@ -16,15 +19,84 @@ from binaryornot.check import is_binary
 from copier import run_copy
 from copier.errors import UserMessageError
 
-# Pattern to detect unreplaced Copier/Jinja variables
-PATTERN = r"\{\{\s*(\w+)\s*\}\}"
-RE_OBJ = re.compile(PATTERN)
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from collections.abc import Iterator
 
 # Known valid patterns that look like Jinja but are actually valid content
-VALID_PATTERNS = {
-    "raw",
-    "endraw",
-}
+VALID_PATTERNS = frozenset(
+    {
+        "raw",
+        "endraw",
+    },
+)
+
+# Template variables that must never survive generation
+TEMPLATE_VARS = frozenset(
+    {
+        "project_name",
+        "project_slug",
+        "author_name",
+        "email",
+        "description",
+        "domain_name",
+        "version",
+        "timezone",
+    },
+)
+
+# Pattern to detect unreplaced Copier/Jinja variables: one of our template variables,
+# or any other lowercase snake_case name that isn't a known valid pattern. Compiled as
+# bytes so files can be scanned without being decoded.
+PATTERN = (
+    rb"\{\{\s*("
+    + b"|".join(re.escape(var).encode() for var in sorted(TEMPLATE_VARS))
+    + rb"|(?!(?:"
+    + b"|".join(re.escape(var).encode() for var in sorted(VALID_PATTERNS))
+    + rb")\s*\}\})(?=\w*_)(?=\w*[a-z])[a-z0-9_]+"
+    + rb")\s*\}\}"
+)
+RE_OBJ = re.compile(PATTERN)
+
+# Extensions that are always text, so they don't need to be sniffed by is_binary
+TEXT_EXTS = frozenset(
+    {
+        ".py",
+        ".html",
+        ".yml",
+        ".yaml",
+        ".md",
+        ".toml",
+        ".txt",
+        ".cfg",
+        ".ini",
+        ".js",
+        ".ts",
+        ".css",
+        ".json",
+        ".example",
+        ".j2",
+    },
+)
+
+# Directories that shouldn't be checked for Jinja variable replacement
+# - .venv, __pycache__, node_modules: build/environment artifacts
+# - turbo/generators: contains Handlebars templates with {{ }} syntax
+# - packages: may contain JSX with {{ }} object literal syntax
+EXCLUDED_DIRS = frozenset({".venv", "__pycache__", "node_modules", "generators", "packages"})
+
+# Build/environment artifacts that django-upgrade shouldn't be pointed at
+BUILD_DIRS = frozenset({".venv", "__pycache__", "node_modules"})
+
+# Split ruff's thread pool between xdist workers instead of each claiming every core.
+# Generated projects have no .git, so gitignore parsing is skipped too.
+RUFF_THREADS = max(1, (os.cpu_count() or 4) // int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1")))
+RUFF_ENV = {**os.environ, "RAYON_NUM_THREADS": str(RUFF_THREADS)}
 
 if sys.platform.startswith("win"):
     pytest.skip("sh doesn't support windows", allow_module_level=True)
@@ -61,11 +133,60 @@ SUPPORTED_COMBINATIONS = [
     {"debug": True},
 ]
 
+# Two-valued options, default first. Pairwise coverage is computed over these only
+BINARY_OPTIONS = {
+    "username_type": ["username", "email"],
+    "use_drf": [True, False],
+    "use_async": [False, True],
+    "use_celery": [True, False],
+    "use_mailpit": [True, False],
+    "use_sentry": [True, False],
+    "use_whitenoise": [True, False],
+    "use_heroku": [False, True],
+    "keep_local_envs_in_vcs": [False, True],
+    "debug": [False, True],
+}
+
+# Multi-valued options, default first. Pairing them would multiply the number of
+# rows, so their values are spread round-robin over the pairwise rows instead
+SPREAD_OPTIONS = {
+    "open_source_license": ["MIT", "BSD", "GPLv3", "Apache Software License 2.0", "Not open source"],
+    "mail_service": ["Mailgun", "Amazon SES", "Sendgrid", "Other SMTP"],
+}
+
+
+def _is_valid_combination(row):
+    """Reject (possibly partial) rows Copier would refuse: heroku requires whitenoise."""
+    values = dict(zip(BINARY_OPTIONS, row, strict=False))
+    return not (values.get("use_heroku") and values.get("use_whitenoise") is False)
+
+
+def _pairwise_combinations():
+    """Build the pairwise rows, keeping only non-default values so that test ids stay readable."""
+    rows = [
+        dict(zip(BINARY_OPTIONS, row, strict=True))
+        for row in AllPairs(list(BINARY_OPTIONS.values()), filter_func=_is_valid_combination)
+    ]
+    for index, row in enumerate(rows):
+        for key, values in SPREAD_OPTIONS.items():
+            row[key] = values[index % len(values)]
+    defaults = {key: values[0] for key, values in (BINARY_OPTIONS | SPREAD_OPTIONS).items()}
+    return [{key: value for key, value in row.items() if value != defaults[key]} for row in rows]
+
+
+PAIRWISE_COMBINATIONS = _pairwise_combinations()
+
 # Quick combinations for fast local iteration
 QUICK_COMBINATIONS = [{}]  # Just defaults
 
-# Select combinations based on environment
-TEST_COMBINATIONS = QUICK_COMBINATIONS if os.getenv("QUICK_TEST") else SUPPORTED_COMBINATIONS
+# Select combinations based on environment: the hand-curated smoke tests are kept
+# for full (e.g. nightly) runs with FULL_MATRIX=1
+if os.getenv("QUICK_TEST"):
+    TEST_COMBINATIONS = QUICK_COMBINATIONS
+elif os.getenv("FULL_MATRIX") == "1":
+    TEST_COMBINATIONS = SUPPORTED_COMBINATIONS
+else:
+    TEST_COMBINATIONS = PAIRWISE_COMBINATIONS
 
 
 def _fixture_id(ctx):
@@ -75,47 +196,44 @@ def _fixture_id(ctx):
     return "-".join(f"{key}:{value}" for key, value in ctx.items())
 
 
-def build_files_list(base_path: Path):
-    """Build a list containing absolute paths to the generated files."""
-    # Exclude directories that shouldn't be checked for Jinja variable replacement
-    # - .venv, __pycache__, node_modules: build/environment artifacts
-    # - turbo/generators: contains Handlebars templates with {{ }} syntax
-    # - packages: may contain JSX with {{ }} object literal syntax
-    excluded_dirs = {".venv", "__pycache__", "node_modules", "generators", "packages"}
+# Lint tests sharing a combination run on the same xdist worker (--dist=loadgroup)
+# so that they reuse a single generated project
+LINT_COMBINATIONS = [
+    pytest.param(ctx, id=_fixture_id(ctx), marks=pytest.mark.xdist_group(name=_fixture_id(ctx)))
+    for ctx in TEST_COMBINATIONS
+]
+
 
-    f = []
-    for dirpath, subdirs, files in base_path.walk():
-        subdirs[:] = [d for d in subdirs if d not in excluded_dirs]
+def iter_files(root: Path | str, exts: set[str] | None = None, skip: frozenset[str] = EXCLUDED_DIRS) -> Iterator[str]:
+    """Yield paths of the files under root, optionally filtered by extension."""
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip:
+                        stack.append(entry.path)
+                elif exts is None or os.path.splitext(entry.name)[1] in exts:  # noqa: PTH122
+                    yield entry.path
 
-        f.extend(dirpath / file_path for file_path in files)
-    return f
+
+def build_files_list(base_path: Path):
+    """Build a list containing absolute paths to the generated text files."""
+    file_paths = (Path(p) for p in iter_files(base_path))
+    return [path for path in file_paths if path.suffix in TEXT_EXTS or not is_binary(str(path))]
 
 
 def check_paths(paths: Iterable[Path]):
     """Method to check all paths have correct substitutions."""
     # Assert that no match is found in any of the files
     for path in paths:
-        if is_binary(str(path)):
+        content = path.read_bytes()
+        # Fast reject files without any Jinja-style expression
+        if b"{{" not in content:
             continue
 
-        content = path.read_text()
-        # Look for unreplaced Jinja patterns
-        for match in RE_OBJ.finditer(content):
-            var_name = match.group(1)
-            # Skip known valid patterns (like Django template tags in raw blocks)
-            if var_name not in VALID_PATTERNS:
-                # Only fail on patterns that look like our template variables
-                if (var_name.islower() and "_" in var_name) or var_name in (
-                    "project_name",
-                    "project_slug",
-                    "author_name",
-                    "email",
-                    "description",
-                    "domain_name",
-                    "version",
-                    "timezone",
-                ):
-                    pytest.fail(f"Copier variable '{var_name}' not replaced in {path}")
+        if match := RE_OBJ.search(content):
+            pytest.fail(f"Copier variable '{match.group(1).decode()}' not replaced in {path}")
 
 
 def generate_project(template_path: Path, dst_path: Path, context: dict, context_override: dict) -> Path:
@@ -133,11 +251,21 @@ def generate_project(template_path: Path, dst_path: Path, context: dict, context
 
     # Fix import ordering - the correct order depends on the project_slug value
     # which isn't known until generation (e.g., 'my_project' vs 'zoo_project')
-    sh.ruff("check", "--select", "I", "--fix", ".", _cwd=str(dst_path))
+    sh.ruff("check", "--no-respect-gitignore", "--select", "I", "--fix", ".", _cwd=str(dst_path), _env=RUFF_ENV)
 
     return dst_path
 
 
+@pytest.fixture(scope="session", params=LINT_COMBINATIONS)
+def generated_project(request, template_path, tmp_path_factory, default_context):
+    """Generate one project per combination, shared by every test using it.
+
+    Tests must treat the project as read-only: formatters run on a copy of it.
+    """
+    dst_path = tmp_path_factory.mktemp("project")
+    return generate_project(template_path, dst_path, default_context, request.param)
+
+
 @pytest.mark.parametrize("context_override", TEST_COMBINATIONS, ids=_fixture_id)
 def test_project_generation(template_path, tmp_path, context, context_override):
     """Test that project is generated and fully rendered."""
@@ -150,59 +278,49 @@ def test_project_generation(template_path, tmp_path, context, context_override):
     check_paths(paths)
 
 
-@pytest.mark.parametrize("context_override", TEST_COMBINATIONS, ids=_fixture_id)
-def test_ruff_check_passes(template_path, tmp_path, context, context_override):
+def test_ruff_check_passes(generated_project):
     """Generated project should pass ruff check."""
-    project_path = generate_project(template_path, tmp_path, context, context_override)
-
     try:
-        sh.ruff("check", ".", _cwd=str(project_path))
+        sh.ruff("check", "--no-respect-gitignore", ".", _cwd=str(generated_project), _env=RUFF_ENV)
     except sh.ErrorReturnCode as e:
         pytest.fail(e.stdout.decode())
 
 
 @auto_fixable
-@pytest.mark.parametrize("context_override", TEST_COMBINATIONS, ids=_fixture_id)
-def test_ruff_format_passes(template_path, tmp_path, context, context_override):
+def test_ruff_format_passes(generated_project, tmp_path):
     """Check whether generated project passes ruff format."""
-    project_path = generate_project(template_path, tmp_path, context, context_override)
-
+    project_path = shutil.copytree(generated_project, tmp_path / "project")
     try:
         sh.ruff(
             "format",
+            "--no-respect-gitignore",
             ".",
             _cwd=str(project_path),
+            _env=RUFF_ENV,
         )
     except sh.ErrorReturnCode as e:
         pytest.fail(e.stdout.decode())
 
 
 @auto_fixable
-@pytest.mark.parametrize("context_override", TEST_COMBINATIONS, ids=_fixture_id)
-def test_django_upgrade_passes(template_path, tmp_path, context, context_override):
+def test_django_upgrade_passes(generated_project):
     """Check whether generated project passes django-upgrade."""
-    project_path = generate_project(template_path, tmp_path, context, context_override)
-
-    python_files = [
-        file_path.removeprefix(f"{project_path}/")
-        for file_path in glob.glob(str(project_path / "**" / "*.py"), recursive=True)  # noqa: PTH207
-    ]
+    python_files = list(iter_files(generated_project, exts={".py"}, skip=BUILD_DIRS))
     try:
         sh.django_upgrade(
+            "--check",
             "--target-version",
             "5.0",
             *python_files,
-            _cwd=str(project_path),
+            _cwd=str(generated_project),
         )
     except sh.ErrorReturnCode as e:
-        pytest.fail(e.stdout.decode())
+        # --check reports the files it would rewrite on stderr
+        pytest.fail(e.stderr.decode())
 
 
-@pytest.mark.parametrize("context_override", TEST_COMBINATIONS, ids=_fixture_id)
-def test_djlint_lint_passes(template_path, tmp_path, context, context_override):
+def test_djlint_lint_passes(generated_project):
     """Check whether generated project passes djLint --lint."""
-    project_path = generate_project(template_path, tmp_path, context, context_override)
-
     autofixable_rules = "H014,T001"
     # TODO: remove T002 when fixed https://github.com/Riverside-Healthcare/djLint/issues/687
     ignored_rules = "H006,H030,H031,T002"
@@ -212,20 +330,17 @@ def test_djlint_lint_passes(template_path, tmp_path, context, context_override):
             "--ignore",
             f"{autofixable_rules},{ignored_rules}",
             ".",
-            _cwd=str(project_path),
+            _cwd=str(generated_project),
         )
     except sh.ErrorReturnCode as e:
         pytest.fail(e.stdout.decode())
 
 
 @auto_fixable
-@pytest.mark.parametrize("context_override", TEST_COMBINATIONS, ids=_fixture_id)
-def test_djlint_check_passes(template_path, tmp_path, context, context_override):
+def test_djlint_check_passes(generated_project):
     """Check whether generated project passes djLint --check."""
-    project_path = generate_project(template_path, tmp_path, context, context_override)
-
     try:
-        sh.djlint("--check", ".", _cwd=str(project_path))
+        sh.djlint("--check", ".", _cwd=str(generated_project))
     except sh.ErrorReturnCode as e:
         pytest.fail(e.stdout.decode())
 
@@ -236,15 +351,15 @@ def test_github_invokes_linter_and_pytest(template_path, tmp_path, context):
 
     assert project_path.is_dir()
 
-    with (project_path / ".github" / "workflows" / "ci.yml").open() as github_yml:
-        try:
-            github_config = yaml.safe_load(github_yml)
-            # Verify linter job exists
-            assert "linter" in github_config["jobs"]
-            # Verify pytest job exists
-            assert "pytest" in github_config["jobs"]
-        except yaml.YAMLError as e:
-            pytest.fail(str(e))
+    github_yml = (project_path / ".github" / "workflows" / "ci.yml").read_bytes()
+    try:
+        github_config = yaml.load(github_yml, Loader=SafeLoader)
+        # Verify linter job exists
+        assert "linter" in github_config["jobs"]
+        # Verify pytest job exists
+        assert "pytest" in github_config["jobs"]
+    except yaml.YAMLError as e:
+        pytest.fail(str(e))
 
 
 @pytest.mark.parametrize("slug", ["project slug", "Project_Slug"])
@@ -6,6 +6,7 @@ from pathlib import Path
 import pytest
 
 from scripts.post_generation import append_to_gitignore_file
+from scripts.post_generation import set_flags_batch
 
 
 @pytest.fixture
@@ -25,3 +26,10 @@ def test_append_to_gitignore_file(working_directory):
     linesep = os.linesep.encode()
     assert gitignore_file.read_bytes() == b"node_modules/" + linesep + b".envs/*" + linesep
     assert gitignore_file.read_text() == "node_modules/\n.envs/*\n"
+
+
+def test_set_flags_batch(working_directory):
+    env_file = working_directory / ".env"
+    env_file.write_text("USER=!!!SET USER!!!\nPASSWORD=!!!SET PASSWORD!!!\nURL=!!!SET URL!!!\n")
+    set_flags_batch(env_file, {"!!!SET USER!!!": "debug", "!!!SET PASSWORD!!!": "secret", "!!!SET URL!!!": None})
+    assert env_file.read_text() == "USER=debug\nPASSWORD=secret\nURL=!!!SET URL!!!\n"
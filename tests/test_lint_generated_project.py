@@ -0,0 +1,27 @@
+"""Unit tests for the generated project lint hook"""
+
+from scripts.lint_generated_project import STDIN_MAX_FILES
+from scripts.lint_generated_project import _get_ruff_path
+from scripts.lint_generated_project import _ruff_check
+
+
+def test_ruff_check_stdin_passes(tmp_path):
+    (tmp_path / "app.py").write_text("import os\n\nprint(os.sep)\n")
+    assert len(list(tmp_path.rglob("*.py"))) <= STDIN_MAX_FILES
+
+    result = _ruff_check(_get_ruff_path(), tmp_path)
+    assert result.returncode == 0
+
+
+def test_ruff_check_stdin_fails(tmp_path):
+    (tmp_path / "app.py").write_text("print('ok')\n")
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "unused.py").write_text("import sys\n")
+
+    result = _ruff_check(_get_ruff_path(), tmp_path)
+    assert result.returncode != 0
+
+    result = _ruff_check(_get_ruff_path(), tmp_path, capture=True)
+    assert result.returncode != 0
+    assert "F401" in result.stdout
+    assert "pkg/unused.py" in result.stdout
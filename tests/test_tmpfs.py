@@ -0,0 +1,19 @@
+"""Unit tests for the shared tmpfs helper"""
+
+from scripts.tmpfs import tmpfs_root
+
+
+def test_tmpfs_root_is_opt_in(monkeypatch):
+    monkeypatch.delenv("COPIER_USE_TMPFS", raising=False)
+    assert tmpfs_root() is None
+
+
+def test_tmpfs_root_needs_free_space(monkeypatch, tmp_path):
+    monkeypatch.setenv("COPIER_USE_TMPFS", "1")
+    monkeypatch.setattr("scripts.tmpfs.sys.platform", "linux")
+    monkeypatch.setattr("scripts.tmpfs.SHM_DIR", tmp_path)
+    monkeypatch.setattr("scripts.tmpfs.SHM_MIN_FREE", 0)
+    assert tmpfs_root() == str(tmp_path)
+
+    monkeypatch.setattr("scripts.tmpfs.SHM_MIN_FREE", float("inf"))
+    assert tmpfs_root() is None